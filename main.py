@@ -1,28 +1,140 @@
 """Main script for the model comparison tool."""
 
 import os
+import asyncio
+import threading
 import click
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from config import MODELS, API_CONFIG, DEFAULT_CONFIG
-from utils import generate_response, display_summary
+from utils import generate_response, generate_batch_response, is_batch_cached, display_summary, prewarm_connections
 
 # Load environment variables from .env file
 load_dotenv()
 
-@click.command()
-@click.option('--query', prompt='Enter your query', help='The query to be processed by the models.')
-@click.option('--model-type', type=click.Choice(['base', 'instruct', 'fine_tuned']), prompt='Choose model type', help='Type of model to use for the query.')
-@click.option('--provider', type=click.Choice(['openai', 'huggingface', 'anthropic']), prompt='Choose provider', help='Model provider.')
-def main(query: str, model_type: str, provider: str):
-    """Main function to handle user input and generate model responses."""
-    model_info = MODELS[model_type][provider]
-    api_config = API_CONFIG[provider]
+# Upper bound on concurrent provider calls
+MAX_WORKERS = 16
 
-    click.echo(f'Using {model_info["name"]} from {provider.capitalize()} for {model_type} query...')
+class _DefaultGroup(click.Group):
+    """Command group that runs `run` (including `run --help`) when no sub-command is given."""
 
-    response = generate_response(query, model_info, api_config, DEFAULT_CONFIG)
-    display_summary(query, response, model_info)
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands:
+            args = ['run', *args]
+        return super().parse_args(ctx, args)
+
+@click.group(cls=_DefaultGroup)
+def cli():
+    """Compare responses across model types and providers."""
+
+def _read_queries(query: str, query_file: str):
+    """Return the queries from --query-file, or the single --query (prompting if missing)."""
+    if query_file:
+        with open(query_file, encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+        if not queries:
+            raise click.UsageError(f'No queries found in {query_file}.')
+        return queries
+    return [query or click.prompt('Enter your query')]
+
+def _select_models(model_type: str, provider: str):
+    """Return (model_info, api_config) pairs matching the model type and provider."""
+    tasks = []
+    for (mtype, prov), model_info in MODELS.items():
+        if model_type in (mtype, 'all') and provider in (prov, 'all'):
+            tasks.append((model_info, API_CONFIG[prov]))
+            click.echo(f'Using {model_info.name} from {prov.capitalize()} for {mtype} query...')
+
+    if not tasks:
+        click.echo(f'No {model_type} model configured for {provider.capitalize()}.')
+    return tasks
+
+@cli.command('run')
+@click.option('--query', help='The query to be processed by the models.')
+@click.option('--query-file', type=click.Path(exists=True, dir_okay=False), help='File with one query per line.')
+@click.option('--batch-size', type=click.IntRange(1, 16), default=8, show_default=True, help='Queries from --query-file combined into each model call.')
+@click.option('--model-type', type=click.Choice(['base', 'instruct', 'fine_tuned', 'all']), prompt='Choose model type', help='Type of model to use for the query.')
+@click.option('--provider', type=click.Choice(['openai', 'huggingface', 'anthropic', 'all']), prompt='Choose provider', help='Model provider.')
+@click.option('--no-cache', is_flag=True, help='Bypass the on-disk response cache.')
+@click.option('--stream/--no-stream', default=True, help='Print tokens as they arrive (single-model runs only).')
+def main(query: str, query_file: str, batch_size: int, model_type: str, provider: str, no_cache: bool, stream: bool):
+    """Main function to handle user input and generate model responses.
+
+    This is the default command. Use `compare --help` for the asyncio-based
+    comparison across many models.
+    """
+    tasks = _select_models(model_type, provider)
+    if not tasks:
+        return
+
+    # Establish TCP+TLS in the background while the user types the query. With
+    # --query/--query-file the request goes out immediately, so a pre-warm could
+    # only race it (and cache hits need no connection at all).
+    prewarm = None
+    if not query and not query_file:
+        api_configs = {model_info.provider_key: api_config for model_info, api_config in tasks}
+        prewarm = threading.Thread(target=prewarm_connections, args=(api_configs,), daemon=True)
+        prewarm.start()
+
+    queries = _read_queries(query, query_file)
+    batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+
+    # Let an in-flight pre-warm finish so the request reuses its connection instead
+    # of opening a second one; no need to wait if every answer comes from the cache
+    if prewarm is not None:
+        all_cached = not no_cache and all(
+            is_batch_cached(batch, model_info, DEFAULT_CONFIG) for model_info, _ in tasks for batch in batches
+        )
+        if not all_cached:
+            prewarm.join(timeout=5)
+
+    # Interleaved token streams from concurrent models would be unreadable
+    if stream and len(tasks) == 1 and len(queries) == 1:
+        model_info, api_config = tasks[0]
+        display_summary(queries[0], generate_response(queries[0], model_info, api_config, DEFAULT_CONFIG, not no_cache, stream=True), model_info)
+        return
+
+    # Provider calls are network-bound, so threads overlap them fully
+    jobs = [(batch, model_info, api_config) for model_info, api_config in tasks for batch in batches]
+    with ThreadPoolExecutor(max_workers=min(len(jobs), MAX_WORKERS)) as executor:
+        futures = {
+            executor.submit(generate_batch_response, batch, model_info, api_config, DEFAULT_CONFIG, not no_cache): (batch, model_info)
+            for batch, model_info, api_config in jobs
+        }
+        for future in as_completed(futures):
+            batch, model_info = futures[future]
+            for batch_query, response in zip(batch, future.result()):
+                display_summary(batch_query, response, model_info)
+
+async def _run_all(queries, tasks, use_cache: bool):
+    """Send every (query, model) pair concurrently and return the results in order."""
+    from utils_async import generate_response_async, new_async_http_client
+    # One client per run, closed on the loop that opened its connections
+    async with new_async_http_client() as http_client:
+        return await asyncio.gather(*[
+            generate_response_async(query, model_info, api_config, DEFAULT_CONFIG, http_client, use_cache)
+            for query in queries
+            for model_info, api_config in tasks
+        ])
+
+@cli.command()
+@click.option('--query', help='The query to be processed by the models.')
+@click.option('--query-file', type=click.Path(exists=True, dir_okay=False), help='File with one query per line.')
+@click.option('--model-type', type=click.Choice(['base', 'instruct', 'fine_tuned', 'all']), default='all', show_default=True, help='Type of model to use for the query.')
+@click.option('--provider', type=click.Choice(['openai', 'huggingface', 'anthropic', 'all']), default='all', show_default=True, help='Model provider.')
+@click.option('--no-cache', is_flag=True, help='Bypass the on-disk response cache.')
+def compare(query: str, query_file: str, model_type: str, provider: str, no_cache: bool):
+    """Run every query against every matching model concurrently with asyncio."""
+    queries = _read_queries(query, query_file)
+    tasks = _select_models(model_type, provider)
+    if not tasks:
+        return
+
+    results = asyncio.run(_run_all(queries, tasks, not no_cache))
+    pairs = [(query, model_info) for query in queries for model_info, _ in tasks]
+    for (pair_query, model_info), response in zip(pairs, results):
+        display_summary(pair_query, response, model_info)
 
 if __name__ == '__main__':
-    main()
+    cli()
@@ -1,116 +1,368 @@
 """Utility functions for the model comparison tool."""
 
 import os
+import sys
+import re
 import json
 import time
+import random
+import shelve
+import hashlib
+import threading
+import orjson
 import requests
-import tiktoken
-from typing import Dict, Any, Optional
-from colorama import init, Fore, Style
-from tabulate import tabulate
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from config import MODELS, ModelInfo
 
-# Initialize colorama for Windows compatibility
-init()
+# Shared session so repeated Hugging Face calls reuse keep-alive connections
+_HF_SESSION = requests.Session()
+_HF_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# HTTP statuses worth retrying (rate limiting and transient gateway/loading errors)
+_RETRY_STATUSES = {429, 502, 503, 504}
+
+def _retry(fn, *, attempts: int = 3, base: float = 1.0):
+    """Call fn, retrying with exponential backoff on rate-limit or network errors."""
+    for i in range(attempts):
+        try:
+            return fn()
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status not in _RETRY_STATUSES or i == attempts - 1:
+                raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if i == attempts - 1:
+                raise
+        time.sleep(base * 2 ** i + random.uniform(0, 0.25))
+
+# On-disk response cache; the lock serialises shelve access across worker threads
+_CACHE_PATH = os.path.join(os.path.expanduser("~/.cache/model_compare"), "responses")
+_CACHE_LOCK = threading.Lock()
+
+def _cache_key(query: str, model_info: ModelInfo, default_config: Dict[str, Any]) -> str:
+    """Build the cache key for a (model, query, generation params) combination."""
+    raw = f"{model_info.name}|{query}|{default_config['max_tokens']}|{default_config['temperature']}"
+    return hashlib.blake2b(raw.encode()).hexdigest()
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Return a cached response dict, or None on a miss or unreadable cache."""
+    try:
+        with _CACHE_LOCK, shelve.open(_CACHE_PATH, flag="r") as cache:
+            return cache.get(key)
+    except Exception:
+        return None
+
+def _cache_put(key: str, result: Dict[str, Any]):
+    """Store a response dict in the cache, ignoring write failures."""
+    try:
+        os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+        with _CACHE_LOCK, shelve.open(_CACHE_PATH) as cache:
+            cache[key] = result
+    except Exception:
+        pass
+
+def _cache_delete(key: str):
+    """Drop a cached response, ignoring missing keys and write failures."""
+    try:
+        with _CACHE_LOCK, shelve.open(_CACHE_PATH) as cache:
+            cache.pop(key, None)
+    except Exception:
+        pass
+
+# Created under a lock: the pre-warm thread and the request threads race for it
+_HTTP_CLIENT = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+def _get_http_client():
+    """Return a pooled httpx client shared by the OpenAI and Anthropic SDKs."""
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is None:
+            import httpx
+            _HTTP_CLIENT = httpx.Client(limits=httpx.Limits(max_keepalive_connections=10))
+        return _HTTP_CLIENT
+
+def prewarm_connections(api_configs: Dict[str, Dict[str, Any]]):
+    """Open pooled HTTPS connections to each provider so the first real call skips the handshake."""
+    for provider, api_config in api_configs.items():
+        # Providers without a key never make a real request
+        if not api_config.get("api_key"):
+            continue
+        try:
+            if provider == "huggingface":
+                _HF_SESSION.head(api_config["base_url"], timeout=5)
+            else:
+                _get_http_client().head(api_config["base_url"], timeout=5)
+        except Exception:
+            # Best effort only; the real request will connect on its own
+            pass
+
+# Heavy or display-only modules are imported on first use to keep CLI startup fast
+@lru_cache(maxsize=None)
+def _tiktoken():
+    """Import tiktoken on first use."""
+    import tiktoken
+    return tiktoken
+
+@lru_cache(maxsize=None)
+def _console():
+    """Import rich and create the shared output console on first use."""
+    from rich.console import Console
+    return Console()
+
+# Known encodings for configured models tiktoken can't resolve by name
+_MODEL_ENCODING_OVERRIDE = {
+    "microsoft/DialoGPT-small": "gpt2",
+    "microsoft/DialoGPT-medium": "gpt2",
+    "distilgpt2": "gpt2",
+    "gpt-3.5-turbo-instruct": "cl100k_base"
+}
+
+@lru_cache(maxsize=32)
+def _get_encoding(model_name: str):
+    """Return the tiktoken encoding for a model, cached across calls."""
+    tiktoken = _tiktoken()
+    override = _MODEL_ENCODING_OVERRIDE.get(model_name)
+    if override:
+        return tiktoken.get_encoding(override)
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+# Configured models served from the Hugging Face Hub
+_HF_MODEL_NAMES = {model.name for model in MODELS.values() if model.provider_key == "huggingface"}
+
+@lru_cache(maxsize=8)
+def _hf_tok(model_name: str):
+    """Load a Hub model's own tokenizer once, or None if it can't be loaded."""
+    try:
+        from tokenizers import Tokenizer
+        return Tokenizer.from_pretrained(model_name)
+    except Exception:
+        return None
 
 def count_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
-    """Count tokens in text using tiktoken."""
+    """Count tokens with the model's own tokenizer for Hub models, otherwise tiktoken."""
+    if "/" in model_name or model_name in _HF_MODEL_NAMES:
+        tokenizer = _hf_tok(model_name)
+        if tokenizer is not None:
+            return len(tokenizer.encode(text).ids)
     try:
-        encoding = tiktoken.encoding_for_model(model_name)
-        return len(encoding.encode(text))
+        return len(_get_encoding(model_name).encode(text))
     except Exception:
         # Fallback: rough estimation
-        return len(text.split()) * 1.3
+        return int(len(text.split()) * 1.3)
 
-def generate_response(query: str, model_info: Dict[str, Any], api_config: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
-    """Generate response from the specified model."""
-    provider = model_info["provider"].lower()
+def generate_response(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], use_cache: bool = True, stream: bool = False) -> Dict[str, Any]:
+    """Generate response from the specified model, serving repeats from the on-disk cache."""
+    key = _cache_key(query, model_info, default_config)
+    if use_cache:
+        cached = _cache_get(key)
+        if cached is not None:
+            return {**cached, "response_time": 0.0, "cached": True}
+    
+    result = _dispatch_response(query, model_info, api_config, default_config, stream)
+    if use_cache and result.get("success"):
+        _cache_put(key, {k: v for k, v in result.items() if k not in ("response_time", "streamed")})
+    return result
+
+# Matches "Answer 1:" blocks in a batched (row-marshaled) response; an explicit
+# header rather than "1." so numbered lists inside an answer can't split it
+_BATCH_ANSWER_RE = re.compile(r"^[ \t*#]*Answer\s+(\d+)\s*[:.)]\**\s*(.*?)(?=^[ \t*#]*Answer\s+\d+\s*[:.)]|\Z)", re.MULTILINE | re.DOTALL | re.IGNORECASE)
+
+def _marshal(queries: List[str]) -> str:
+    """Combine several queries into a single numbered prompt."""
+    lines = [
+        f"Answer each of the {len(queries)} questions below separately.",
+        'Start each answer on its own line with "Answer <n>:", where <n> is the question number.',
+        ""
+    ]
+    lines += [f"Question {i}: {q}" for i, q in enumerate(queries, 1)]
+    return "\n".join(lines)
+
+def _unmarshal(text: str, count: int) -> Optional[List[Optional[str]]]:
+    """Split a batched response back into per-query answers, or None if it is ambiguous."""
+    answers: List[Optional[str]] = [None] * count
+    last = 0
+    for match in _BATCH_ANSWER_RE.finditer(text):
+        number = int(match.group(1))
+        # Headers must be strictly increasing and in range; anything else can't be trusted
+        if number <= last or number > count:
+            return None
+        answers[number - 1] = match.group(2).strip()
+        last = number
+    return answers
+
+def is_batch_cached(queries: List[str], model_info: ModelInfo, default_config: Dict[str, Any]) -> bool:
+    """Return whether generate_batch_response would answer these queries entirely from the cache."""
+    if len(queries) == 1 or model_info.provider_key == "huggingface":
+        return all(_cache_get(_cache_key(query, model_info, default_config)) is not None for query in queries)
+    return _cache_get(_cache_key(_marshal(queries), model_info, default_config)) is not None
+
+def generate_batch_response(queries: List[str], model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], use_cache: bool = True) -> List[Dict[str, Any]]:
+    """Answer several queries with one model call and return a response dict per query."""
+    # The small Hub models can't follow the "Answer <n>:" format, so never batch them
+    if len(queries) == 1 or model_info.provider_key == "huggingface":
+        return [generate_response(query, model_info, api_config, default_config, use_cache) for query in queries]
+    
+    prompt = _marshal(queries)
+    result = generate_response(prompt, model_info, api_config, default_config, use_cache)
+    if not result.get("success"):
+        return [result] * len(queries)
+    
+    answers = _unmarshal(result["response"], len(queries))
+    if answers is None or None in answers:
+        # The model ignored the answer format; don't keep the reply, ask one query at a time
+        if use_cache:
+            _cache_delete(_cache_key(prompt, model_info, default_config))
+        return [generate_response(query, model_info, api_config, default_config, use_cache) for query in queries]
+    
+    return [{**result, "response": answer, "batch_size": len(queries)} for answer in answers]
+
+def _dispatch_response(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], stream: bool = False) -> Dict[str, Any]:
+    """Route the query to the provider-specific API call."""
+    provider = model_info.provider_key
     
     if provider == "openai":
-        return _call_openai_api(query, model_info, api_config, default_config)
+        return _call_openai_api(query, model_info, api_config, default_config, stream)
     elif provider == "anthropic":
-        return _call_anthropic_api(query, model_info, api_config, default_config)
-    elif provider == "hugging face":
+        return _call_anthropic_api(query, model_info, api_config, default_config, stream)
+    elif provider == "huggingface":
         return _call_huggingface_api(query, model_info, api_config, default_config)
     else:
         return {"error": f"Provider {provider} not supported"}
 
-def _call_openai_api(query: str, model_info: Dict[str, Any], api_config: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
+def _write_stream(text: str):
+    """Echo a streamed chunk to stdout as soon as it arrives."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+_OPENAI_NO_KEY_ERROR = "OpenAI API key not found. Please set OPENAI_API_KEY in your .env file."
+_ANTHROPIC_NO_KEY_ERROR = "Anthropic API key not found. Please set ANTHROPIC_API_KEY in your .env file."
+
+def _openai_request(query: str, model_info: ModelInfo, default_config: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+    """Return whether the model uses the completion API, and the create() arguments."""
+    # Base instruct models use the completion API; everything else uses chat
+    is_completion = model_info.type == "base" and "instruct" in model_info.name
+    request = {
+        "model": model_info.name,
+        "max_tokens": default_config["max_tokens"],
+        "temperature": default_config["temperature"]
+    }
+    if is_completion:
+        request["prompt"] = query
+    else:
+        request["messages"] = [{"role": "user", "content": query}]
+    return is_completion, request
+
+def _openai_result(response: Any, is_completion: bool) -> Tuple[str, int]:
+    """Extract the response text and total token usage from an OpenAI response."""
+    if is_completion:
+        return response.choices[0].text.strip(), response.usage.total_tokens
+    return response.choices[0].message.content, response.usage.total_tokens
+
+def _anthropic_request(query: str, model_info: ModelInfo, default_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the messages.create() arguments for an Anthropic model."""
+    return {
+        "model": model_info.name,
+        "max_tokens": default_config["max_tokens"],
+        "temperature": default_config["temperature"],
+        "messages": [{"role": "user", "content": query}]
+    }
+
+def _anthropic_result(response: Any) -> Tuple[str, int]:
+    """Extract the response text and total token usage from an Anthropic message."""
+    return response.content[0].text, response.usage.input_tokens + response.usage.output_tokens
+
+def _call_openai_api(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], stream: bool = False) -> Dict[str, Any]:
     """Call OpenAI API."""
     if not api_config["api_key"]:
-        return {"error": "OpenAI API key not found. Please set OPENAI_API_KEY in your .env file."}
+        return {"error": _OPENAI_NO_KEY_ERROR}
     
     try:
         import openai
-        client = openai.OpenAI(api_key=api_config["api_key"])
+        client = openai.OpenAI(api_key=api_config["api_key"], http_client=_get_http_client(), max_retries=3)
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # Handle different model types
-        if model_info["type"] == "base" and "instruct" in model_info["name"]:
-            # Use completion API for base instruct models
-            response = client.completions.create(
-                model=model_info["name"],
-                prompt=query,
-                max_tokens=default_config["max_tokens"],
-                temperature=default_config["temperature"]
-            )
-            response_text = response.choices[0].text.strip()
-            tokens_used = response.usage.total_tokens
+        is_completion, request = _openai_request(query, model_info, default_config)
+        endpoint = client.completions if is_completion else client.chat.completions
+        
+        if stream:
+            response = endpoint.create(**request, stream=True, stream_options={"include_usage": True})
+            parts = []
+            usage = None
+            for chunk in response:
+                # The final chunk carries usage and no choices
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].text if is_completion else chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    _write_stream(text)
+            _write_stream("\n")
+            response_text = "".join(parts).strip()
+            tokens_used = usage.total_tokens if usage else count_tokens(query + response_text, model_info.name)
         else:
-            # Use chat API for chat models
-            response = client.chat.completions.create(
-                model=model_info["name"],
-                messages=[{"role": "user", "content": query}],
-                max_tokens=default_config["max_tokens"],
-                temperature=default_config["temperature"]
-            )
-            response_text = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens
+            response_text, tokens_used = _openai_result(endpoint.create(**request), is_completion)
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         return {
             "response": response_text,
             "tokens_used": tokens_used,
             "response_time": end_time - start_time,
-            "success": True
+            "success": True,
+            "streamed": stream
         }
     except Exception as e:
         return {"error": str(e), "success": False}
 
-def _call_anthropic_api(query: str, model_info: Dict[str, Any], api_config: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
+def _call_anthropic_api(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], stream: bool = False) -> Dict[str, Any]:
     """Call Anthropic API."""
     if not api_config["api_key"]:
-        return {"error": "Anthropic API key not found. Please set ANTHROPIC_API_KEY in your .env file."}
+        return {"error": _ANTHROPIC_NO_KEY_ERROR}
     
     try:
         import anthropic
-        client = anthropic.Anthropic(api_key=api_config["api_key"])
+        client = anthropic.Anthropic(api_key=api_config["api_key"], http_client=_get_http_client(), max_retries=3)
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        response = client.messages.create(
-            model=model_info["name"],
-            max_tokens=default_config["max_tokens"],
-            temperature=default_config["temperature"],
-            messages=[{"role": "user", "content": query}]
-        )
+        request = _anthropic_request(query, model_info, default_config)
         
-        end_time = time.time()
+        if stream:
+            with client.messages.stream(**request) as message_stream:
+                for text in message_stream.text_stream:
+                    _write_stream(text)
+                response = message_stream.get_final_message()
+            _write_stream("\n")
+        else:
+            response = client.messages.create(**request)
         
-        response_text = response.content[0].text
-        tokens_used = response.usage.input_tokens + response.usage.output_tokens
+        end_time = time.perf_counter()
+        
+        response_text, tokens_used = _anthropic_result(response)
         
         return {
             "response": response_text,
             "tokens_used": tokens_used,
             "response_time": end_time - start_time,
-            "success": True
+            "success": True,
+            "streamed": stream
         }
     except Exception as e:
         return {"error": str(e), "success": False}
 
-def _call_huggingface_api(query: str, model_info: Dict[str, Any], api_config: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
+_HF_UNAVAILABLE_ERROR = "HuggingFace API unavailable. This might be due to: \n1. Model not available on Inference API\n2. Rate limiting\n3. API permissions\n\nSuggestion: Try again later or use OpenAI/Anthropic models."
+_HF_NO_KEY_ERROR = "No HuggingFace API key provided, and local model execution needs transformers and torch installed."
+
+def _call_huggingface_api(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
     """Call Hugging Face API or use local model."""
     try:
         # First try API if key is available
@@ -118,81 +370,81 @@ def _call_huggingface_api(query: str, model_info: Dict[str, Any], api_config: Di
             result = _call_huggingface_hosted_api(query, model_info, api_config, default_config)
             # If API fails, try different approach or return informative error
             if not result.get("success"):
-                return {
-                    "error": f"HuggingFace API unavailable. This might be due to: \n1. Model not available on Inference API\n2. Rate limiting\n3. API permissions\n\nSuggestion: Try again later or use OpenAI/Anthropic models.",
-                    "success": False
-                }
+                return {"error": _HF_UNAVAILABLE_ERROR, "success": False}
             return result
         else:
-            # Fall back to local model (but warn about performance)
-            return {
-                "error": "No HuggingFace API key provided. Local model execution requires significant computational resources.",
-                "success": False
-            }
+            # Fall back to a local model when transformers and torch are installed
+            from importlib.util import find_spec
+            if find_spec("transformers") and find_spec("torch"):
+                return _call_huggingface_local(query, model_info, default_config)
+            return {"error": _HF_NO_KEY_ERROR, "success": False}
     except Exception as e:
         return {"error": f"HuggingFace integration error: {str(e)}", "success": False}
 
-def _call_huggingface_hosted_api(query: str, model_info: Dict[str, Any], api_config: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
+def _hf_payload(query: str, default_config: Dict[str, Any]) -> bytes:
+    """Build the JSON request body for the Hugging Face Inference API."""
+    # Text-generation schema for every causal LM; the server strips the echoed prompt
+    payload = {
+        "inputs": query,
+        "parameters": {
+            "max_new_tokens": min(default_config["max_tokens"], 100),
+            "temperature": default_config["temperature"],
+            "return_full_text": False,
+            "do_sample": True
+        }
+    }
+    return orjson.dumps(payload)
+
+def _parse_hf_result(result: Any) -> str:
+    """Extract the generated text from a Hugging Face Inference API result."""
+    # Handle different response formats
+    if isinstance(result, list) and len(result) > 0:
+        if "generated_text" in result[0]:
+            return result[0]["generated_text"].strip()
+        elif "text" in result[0]:
+            return result[0]["text"]
+        else:
+            return str(result[0])
+    elif isinstance(result, dict):
+        if "generated_text" in result:
+            return result["generated_text"].strip()
+        else:
+            return str(result)
+    else:
+        return str(result)
+
+def _call_huggingface_hosted_api(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
     """Call Hugging Face hosted API."""
     headers = {
         "Authorization": f"Bearer {api_config['api_key']}",
         "Content-Type": "application/json"
     }
-    url = f"{api_config['base_url']}/{model_info['name']}"
+    url = f"{api_config['base_url']}/{model_info.name}"
     
-    # Different payload format based on model type
-    if "DialoGPT" in model_info['name']:
-        payload = {
-            "inputs": {
-                "text": query
-            },
-            "parameters": {
-                "max_length": min(default_config["max_tokens"], 100),
-                "temperature": default_config["temperature"],
-                "do_sample": True
-            }
-        }
-    else:
-        payload = {
-            "inputs": query,
-            "parameters": {
-                "max_new_tokens": min(default_config["max_tokens"], 100),
-                "temperature": default_config["temperature"],
-                "return_full_text": False
-            }
-        }
+    body = _hf_payload(query, default_config)
+    
+    def _post():
+        response = _HF_SESSION.post(url, headers=headers, data=body, timeout=30)
+        if response.status_code in _RETRY_STATUSES:
+            response.raise_for_status()
+        return response
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        end_time = time.time()
+        try:
+            response = _retry(_post)
+        except requests.exceptions.HTTPError as e:
+            # Retries exhausted; fall through to the status-code handling below
+            response = e.response
+        end_time = time.perf_counter()
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             
-            # Handle different response formats
-            if isinstance(result, list) and len(result) > 0:
-                if "generated_text" in result[0]:
-                    response_text = result[0]["generated_text"]
-                    # Remove the original query from the response if it's included
-                    if response_text.startswith(query):
-                        response_text = response_text[len(query):].strip()
-                elif "text" in result[0]:
-                    response_text = result[0]["text"]
-                else:
-                    response_text = str(result[0])
-            elif isinstance(result, dict):
-                if "generated_text" in result:
-                    response_text = result["generated_text"]
-                    if response_text.startswith(query):
-                        response_text = response_text[len(query):].strip()
-                else:
-                    response_text = str(result)
-            else:
-                response_text = str(result)
+            response_text = _parse_hf_result(result)
             
-            tokens_used = count_tokens(query + response_text, model_info["name"])
+            tokens_used = count_tokens(query + response_text, model_info.name)
             
             return {
                 "response": response_text,
@@ -210,45 +462,74 @@ def _call_huggingface_hosted_api(query: str, model_info: Dict[str, Any], api_con
     except Exception as e:
         return {"error": f"API call error: {str(e)}", "success": False}
 
-def _call_huggingface_local(query: str, model_info: Dict[str, Any], default_config: Dict[str, Any]) -> Dict[str, Any]:
+@lru_cache(maxsize=4)
+def _load_hf(model_name: str):
+    """Load a local Hugging Face tokenizer and model once per process."""
+    from importlib.util import find_spec
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    import torch
+    
+    use_cuda = torch.cuda.is_available()
+    if use_cuda:
+        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    else:
+        dtype = torch.float32
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = None
+    if use_cuda and find_spec("flash_attn"):
+        # Not every architecture supports FlashAttention-2; from_pretrained raises if not
+        try:
+            model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=dtype, attn_implementation="flash_attention_2")
+        except (ValueError, ImportError):
+            model = None
+    if model is None:
+        # transformers picks SDPA by default where the architecture supports it
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=dtype)
+    model.to("cuda" if use_cuda else "cpu").eval()
+    
+    # CUDA-graph compilation only pays off with a static KV cache; with the default
+    # dynamic cache every decoding step is a new shape and recompiles. GPT-2-family
+    # models don't support a static cache, so they stay eager.
+    if use_cuda and getattr(model, "_supports_static_cache", False):
+        try:
+            model.generation_config.cache_implementation = "static"
+            model.forward = torch.compile(model.forward, mode="reduce-overhead")
+        except Exception:
+            model.generation_config.cache_implementation = None
+    
+    return tokenizer, model
+
+def _call_huggingface_local(query: str, model_info: ModelInfo, default_config: Dict[str, Any]) -> Dict[str, Any]:
     """Use local Hugging Face model."""
     try:
-        from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
         import torch
         
-        model_name = model_info["name"]
-        
-        start_time = time.time()
+        model_name = model_info.name
         
-        # Load model and tokenizer
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        model = AutoModelForCausalLM.from_pretrained(model_name)
+        start_time = time.perf_counter()
         
-        # Create pipeline
-        generator = pipeline(
-            "text-generation",
-            model=model,
-            tokenizer=tokenizer,
-            device=0 if torch.cuda.is_available() else -1
-        )
+        # Load (or reuse) model and tokenizer
+        tokenizer, model = _load_hf(model_name)
+        input_ids = tokenizer(query, return_tensors="pt").input_ids.to(model.device)
         
         # Generate response
-        result = generator(
-            query,
-            max_new_tokens=default_config["max_tokens"],
-            temperature=default_config["temperature"],
-            do_sample=True,
-            pad_token_id=tokenizer.eos_token_id
-        )
-        
-        end_time = time.time()
+        with torch.inference_mode():
+            output = model.generate(
+                input_ids,
+                max_new_tokens=default_config["max_tokens"],
+                temperature=default_config["temperature"],
+                do_sample=True,
+                pad_token_id=tokenizer.eos_token_id,
+                return_dict_in_generate=True
+            )
         
-        response_text = result[0]["generated_text"]
-        # Remove the original query from the response
-        if response_text.startswith(query):
-            response_text = response_text[len(query):].strip()
+        end_time = time.perf_counter()
         
-        tokens_used = count_tokens(query + response_text, model_name)
+        # The sequence holds prompt + generated ids; decode only the new tokens
+        sequence = output.sequences[0]
+        response_text = tokenizer.decode(sequence[input_ids.shape[1]:], skip_special_tokens=True).strip()
+        tokens_used = int(sequence.shape[0])
         
         return {
             "response": response_text,
@@ -259,43 +540,59 @@ def _call_huggingface_local(query: str, model_info: Dict[str, Any], default_conf
     except Exception as e:
         return {"error": f"Local model error: {str(e)}", "success": False}
 
-def display_summary(query: str, response_data: Dict[str, Any], model_info: Dict[str, Any]):
+def _table(headers: List[str], rows: List[List[str]]):
+    """Build a rich table with a line between rows."""
+    from rich.table import Table
+    table = Table(show_header=True, show_lines=True)
+    for header in headers:
+        table.add_column(header)
+    for row in rows:
+        table.add_row(*(str(cell) for cell in row))
+    return table
+
+def display_summary(query: str, response_data: Dict[str, Any], model_info: ModelInfo):
     """Display the response and model characteristics in a formatted way."""
-    print(f"\n{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
-    print(f"{Fore.YELLOW}Query:{Style.RESET_ALL} {query}")
-    print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+    from rich.markup import escape
+    console = _console()
+    
+    console.print(f"\n[cyan]{'='*80}[/cyan]")
+    console.print(f"[yellow]Query:[/yellow] {escape(query)}")
+    console.print(f"[cyan]{'='*80}[/cyan]")
     
     if response_data.get("success"):
-        print(f"\n{Fore.GREEN}Response:{Style.RESET_ALL}")
-        print(f"{response_data['response']}")
+        console.print("\n[green]Response:[/green]")
+        if response_data.get("streamed"):
+            console.print("(streamed above)")
+        else:
+            console.print(response_data["response"], markup=False, highlight=False)
         
         # Display metrics
-        print(f"\n{Fore.MAGENTA}Response Metrics:{Style.RESET_ALL}")
+        console.print("\n[magenta]Response Metrics:[/magenta]")
         metrics_table = [
-            ["Tokens Used", response_data.get("tokens_used", "N/A")],
-            ["Response Time", f"{response_data.get('response_time', 0):.2f}s"],
-            ["Context Window", f"{model_info['context_window']} tokens"]
+            ["Tokens Used", str(response_data.get("tokens_used", "N/A")) + (f" (batch of {response_data['batch_size']})" if response_data.get("batch_size") else "")],
+            ["Response Time", f"{response_data.get('response_time', 0):.2f}s" + (" (cached)" if response_data.get("cached") else "")],
+            ["Context Window", f"{model_info.context_window} tokens"]
         ]
-        print(tabulate(metrics_table, headers=["Metric", "Value"], tablefmt="grid"))
+        console.print(_table(["Metric", "Value"], metrics_table))
         
     else:
-        print(f"\n{Fore.RED}Error:{Style.RESET_ALL} {response_data.get('error', 'Unknown error')}")
+        console.print(f"\n[red]Error:[/red] {escape(response_data.get('error', 'Unknown error'))}")
     
     # Display model characteristics
-    print(f"\n{Fore.BLUE}Model Characteristics:{Style.RESET_ALL}")
-    characteristics = model_info["characteristics"]
+    console.print("\n[blue]Model Characteristics:[/blue]")
+    characteristics = model_info.characteristics
     char_table = [
-        ["Model Name", model_info["name"]],
-        ["Provider", model_info["provider"]],
-        ["Type", model_info["type"].replace("_", " ").title()],
-        ["Description", characteristics["description"]],
-        ["Fine-tuning Strategy", characteristics["fine_tuning_strategy"]],
-        ["Instruction Following", characteristics["instruction_following"]],
-        ["Use Cases", characteristics["use_cases"]]
+        ["Model Name", model_info.name],
+        ["Provider", model_info.provider],
+        ["Type", model_info.type.replace("_", " ").title()],
+        ["Description", characteristics.description],
+        ["Fine-tuning Strategy", characteristics.fine_tuning_strategy],
+        ["Instruction Following", characteristics.instruction_following],
+        ["Use Cases", characteristics.use_cases]
     ]
-    print(tabulate(char_table, headers=["Characteristic", "Details"], tablefmt="grid"))
+    console.print(_table(["Characteristic", "Details"], char_table))
     
-    print(f"\n{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+    console.print(f"\n[cyan]{'='*80}[/cyan]")
 
 def create_visualization(token_usage_data: Dict[str, int], output_path: str = "token_usage.png"):
     """Create a simple visualization of token usage."""
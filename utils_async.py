@@ -0,0 +1,199 @@
+"""Async provider calls for running many model comparisons concurrently."""
+
+import time
+import random
+import asyncio
+import httpx
+import orjson
+from functools import lru_cache
+from typing import Dict, Any
+from config import ModelInfo, API_CONFIG
+from utils import (
+    count_tokens, _cache_key, _cache_get, _cache_put, _hf_payload, _parse_hf_result,
+    _openai_request, _openai_result, _anthropic_request, _anthropic_result,
+    _RETRY_STATUSES, _HF_UNAVAILABLE_ERROR, _OPENAI_NO_KEY_ERROR, _ANTHROPIC_NO_KEY_ERROR
+)
+
+def new_async_http_client() -> httpx.AsyncClient:
+    """Create the async HTTP/2 client for one run; use it with `async with` so it is closed on its loop."""
+    return httpx.AsyncClient(limits=httpx.Limits(max_connections=64), http2=True)
+
+class RateLimiter:
+    """Token-bucket limiter for a provider's requests-per-minute and tokens-per-minute."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, est_tokens: int):
+        """Wait until one request and est_tokens tokens are available, then take them."""
+        est_tokens = min(est_tokens, self.tpm)
+        # The limiter outlives a single asyncio.run(); locks can't cross event loops
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        # Holding the lock while sleeping serves waiters in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= est_tokens:
+                    self._requests -= 1
+                    self._tokens -= est_tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (est_tokens - self._tokens) * 60 / self.tpm
+                )
+                await asyncio.sleep(wait)
+
+@lru_cache(maxsize=None)
+def _get_rate_limiter(provider_key: str) -> RateLimiter:
+    """Return the rate limiter shared by all requests to a provider."""
+    config = API_CONFIG[provider_key]
+    return RateLimiter(config["rpm"], config["tpm"])
+
+async def _retry_async(fn, *, attempts: int = 3, base: float = 1.0):
+    """Await fn(), retrying with exponential backoff on rate-limit or network errors."""
+    for i in range(attempts):
+        try:
+            return await fn()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in _RETRY_STATUSES or i == attempts - 1:
+                raise
+        except httpx.TransportError:
+            if i == attempts - 1:
+                raise
+        await asyncio.sleep(base * 2 ** i + random.uniform(0, 0.25))
+
+async def generate_response_async(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], http_client: httpx.AsyncClient, use_cache: bool = True) -> Dict[str, Any]:
+    """Generate response from the specified model without blocking the event loop."""
+    key = _cache_key(query, model_info, default_config)
+    if use_cache:
+        cached = await asyncio.to_thread(_cache_get, key)
+        if cached is not None:
+            return {**cached, "response_time": 0.0, "cached": True}
+
+    # Without a key the provider call fails fast, so don't estimate tokens or spend budget
+    if api_config.get("api_key"):
+        # The first count per model may download a tokenizer; keep it off the event loop
+        est_tokens = await asyncio.to_thread(count_tokens, query, model_info.name)
+        await _get_rate_limiter(model_info.provider_key).acquire(est_tokens + default_config["max_tokens"])
+    result = await _dispatch_response_async(query, model_info, api_config, default_config, http_client)
+    if use_cache and result.get("success"):
+        await asyncio.to_thread(_cache_put, key, {k: v for k, v in result.items() if k != "response_time"})
+    return result
+
+async def _dispatch_response_async(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], http_client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Route the query to the provider-specific async API call."""
+    provider = model_info.provider_key
+
+    if provider == "openai":
+        return await _call_openai_api_async(query, model_info, api_config, default_config, http_client)
+    elif provider == "anthropic":
+        return await _call_anthropic_api_async(query, model_info, api_config, default_config, http_client)
+    elif provider == "huggingface":
+        return await _call_huggingface_api_async(query, model_info, api_config, default_config, http_client)
+    else:
+        return {"error": f"Provider {provider} not supported"}
+
+async def _call_openai_api_async(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], http_client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Call OpenAI API asynchronously."""
+    if not api_config["api_key"]:
+        return {"error": _OPENAI_NO_KEY_ERROR}
+
+    try:
+        import openai
+        client = openai.AsyncOpenAI(api_key=api_config["api_key"], http_client=http_client, max_retries=3)
+
+        start_time = time.perf_counter()
+
+        is_completion, request = _openai_request(query, model_info, default_config)
+        endpoint = client.completions if is_completion else client.chat.completions
+        response_text, tokens_used = _openai_result(await endpoint.create(**request), is_completion)
+
+        end_time = time.perf_counter()
+
+        return {
+            "response": response_text,
+            "tokens_used": tokens_used,
+            "response_time": end_time - start_time,
+            "success": True
+        }
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+async def _call_anthropic_api_async(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], http_client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Call Anthropic API asynchronously."""
+    if not api_config["api_key"]:
+        return {"error": _ANTHROPIC_NO_KEY_ERROR}
+
+    try:
+        import anthropic
+        client = anthropic.AsyncAnthropic(api_key=api_config["api_key"], http_client=http_client, max_retries=3)
+
+        start_time = time.perf_counter()
+
+        response = await client.messages.create(**_anthropic_request(query, model_info, default_config))
+        response_text, tokens_used = _anthropic_result(response)
+
+        end_time = time.perf_counter()
+
+        return {
+            "response": response_text,
+            "tokens_used": tokens_used,
+            "response_time": end_time - start_time,
+            "success": True
+        }
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+async def _call_huggingface_api_async(query: str, model_info: ModelInfo, api_config: Dict[str, Any], default_config: Dict[str, Any], http_client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Call the Hugging Face hosted API asynchronously."""
+    if not api_config.get("api_key"):
+        return {"error": "No HuggingFace API key provided. The compare sub-command only uses the hosted Inference API.", "success": False}
+
+    headers = {
+        "Authorization": f"Bearer {api_config['api_key']}",
+        "Content-Type": "application/json"
+    }
+    url = f"{api_config['base_url']}/{model_info.name}"
+    body = _hf_payload(query, default_config)
+
+    async def _post():
+        response = await http_client.post(url, headers=headers, content=body, timeout=30)
+        if response.status_code in _RETRY_STATUSES:
+            response.raise_for_status()
+        return response
+
+    start_time = time.perf_counter()
+
+    try:
+        response = await _retry_async(_post)
+        end_time = time.perf_counter()
+
+        if response.status_code != 200:
+            return {"error": _HF_UNAVAILABLE_ERROR, "success": False}
+
+        response_text = _parse_hf_result(orjson.loads(response.content))
+
+        return {
+            "response": response_text,
+            "tokens_used": count_tokens(query + response_text, model_info.name),
+            "response_time": end_time - start_time,
+            "success": True
+        }
+    except Exception:
+        return {"error": _HF_UNAVAILABLE_ERROR, "success": False}